@@ -1,15 +1,26 @@
 import os
+import re
 import json
 import time
+import asyncio
+import sqlite3
+import hashlib
+import functools
+from datetime import date
+import orjson
 import requests
-from typing import TypedDict, List, Dict, Annotated
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from typing import TypedDict, List, Dict, Set, Annotated
 from dotenv import load_dotenv
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeoutError
-from langchain_google_genai import ChatGoogleGenerativeAI
+import httpx
+from lxml import html as lxml_html
+from selectolax.parser import HTMLParser
 from pydantic import BaseModel, Field
 from langchain_core.messages import SystemMessage
 from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 
 # --- Load Environment Variables ---
 load_dotenv()
@@ -19,13 +30,46 @@ if not os.getenv("GOOGLE_API_KEY"):
 # --- 1. Agent State ---
 class AgentState(TypedDict):
     user_preferences: Dict
+    user_prefs_json: str
     websites_to_scan: List[Dict]
     raw_scraped_data: List[Dict]
     relevant_opportunities: List[Dict]
     new_opportunities: List[Dict]
-    sent_job_ids: List[str]
+    sent_job_ids: Set[str]
     run_log: Annotated[list, add_messages]
 
+def _write_json_atomic(path: str, data, indent: bool = False):
+    """Serialize with orjson (C-speed) and swap the file into place with
+    os.replace so a crash mid-write can never leave a truncated file."""
+    option = orjson.OPT_INDENT_2 if indent else 0
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(orjson.dumps(data, option=option))
+    os.replace(tmp, path)
+
+# --- Sent-job history (SQLite) ---
+SENT_JOBS_DB = 'sent_jobs.db'
+_sent_db = None
+
+def _sent_jobs_db() -> sqlite3.Connection:
+    """Open (once) the on-disk history of already-alerted job ids. A primary
+    key lookup is O(1) regardless of how long the agent has been running,
+    unlike the old grow-forever sent_jobs.json list."""
+    global _sent_db
+    if _sent_db is None:
+        _sent_db = sqlite3.connect(SENT_JOBS_DB, check_same_thread=False)
+        _sent_db.execute('CREATE TABLE IF NOT EXISTS sent(id TEXT PRIMARY KEY)')
+        # One-time import of the legacy JSON history, if present.
+        if os.path.exists('sent_jobs.json'):
+            try:
+                with open('sent_jobs.json', 'r') as f:
+                    legacy = json.load(f)
+                _sent_db.executemany('INSERT OR IGNORE INTO sent(id) VALUES (?)', [(job_id,) for job_id in legacy])
+            except (json.JSONDecodeError, TypeError):
+                pass
+        _sent_db.commit()
+    return _sent_db
+
 # --- 2. Pydantic Models ---
 class FilteredJob(BaseModel):
     title: str = Field(description="The extracted job title.")
@@ -37,197 +81,419 @@ class FilteredJob(BaseModel):
 class JobFilterBatch(BaseModel):
     matched_jobs: List[FilteredJob] = Field(description="A list of job opportunities that match the user's criteria.")
 
-# --- 3. SCRAPING FUNCTIONS (WITH DETAILED LOGGING) ---
-def scrape_internshala(page, query: str) -> List[Dict]:
+# --- 3. PERSISTENT BROWSER POOL ---
+POOL_SIZE = 2
+BROWSER_POOL_RECYCLE_AFTER = 100
+
+class BrowserPool:
+    """Keeps Chromium instances alive across agent runs so each cron tick
+    skips the ~1s browser cold-start. Contexts are handed out round-robin
+    and browsers are recycled after serving BROWSER_POOL_RECYCLE_AFTER
+    contexts to bound native memory drift. Async so many contexts can
+    interleave their CDP traffic on the same event loop."""
+    def __init__(self, size: int = POOL_SIZE):
+        self._size = size
+        self._playwright = None
+        self._browsers = []
+        self._contexts_served = []
+        self._next = 0
+        self._lock = asyncio.Lock()
+
+    async def _ensure_started(self):
+        if self._playwright is None:
+            # Imported here so scrape-free invocations (e.g. --help, config
+            # errors) never pay Playwright's import cost.
+            from playwright.async_api import async_playwright
+            self._playwright = await async_playwright().start()
+            self._browsers = [await self._playwright.chromium.launch(headless=True) for _ in range(self._size)]
+            self._contexts_served = [0] * self._size
+
+    async def checkout(self):
+        async with self._lock:
+            await self._ensure_started()
+            i = self._next
+            self._next = (self._next + 1) % self._size
+            if self._contexts_served[i] > BROWSER_POOL_RECYCLE_AFTER:
+                await self._browsers[i].close()
+                self._browsers[i] = await self._playwright.chromium.launch(headless=True)
+                self._contexts_served[i] = 0
+            self._contexts_served[i] += 1
+            return await self._browsers[i].new_context(user_agent='Mozilla/5.0')
+
+    async def checkin(self, context):
+        await context.close()
+
+browser_pool = BrowserPool()
+
+# --- 4. SCRAPING FUNCTIONS (WITH DETAILED LOGGING) ---
+_BLOCKED_RESOURCE_TYPES = {'image', 'font', 'media', 'stylesheet'}
+
+# Precompiled XPaths for the Playwright paths: the page HTML is pulled once
+# with page.content() and parsed at C speed by libxml2, so extraction costs
+# a single CDP round-trip regardless of container count.
+_INTERNSHALA_CONTAINER_XP = lxml_html.etree.XPath("//div[contains(@class,'individual_internship')]")
+_INTERNSHALA_LINK_XP = lxml_html.etree.XPath(".//h3[contains(@class,'job-internship-name')]/a/@href")
+_UNSTOP_CONTAINER_XP = lxml_html.etree.XPath("//app-competition-listing/div")
+_REMOTEOK_CONTAINER_XP = lxml_html.etree.XPath(
+    "//tr[contains(concat(' ',normalize-space(@class),' '),' job ') and not(contains(@class,'placeholder'))]")
+
+async def _block_heavy_resources(page):
+    """We only read text out of the job list, so skip downloading images,
+    fonts, media and CSS entirely."""
+    async def handle(route):
+        if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+        else:
+            await route.continue_()
+    await page.route('**/*', handle)
+
+async def _scrape_static(url: str, container_css: str, link_css: str = None, base_url: str = "",
+                         link_attr: str = "href") -> List[Dict]:
+    """Fast path for server-rendered sites: plain HTTP GET + selectolax's
+    C-backed parser, no browser involved. Returns [] on any failure so the
+    caller can fall back to Playwright."""
+    try:
+        async with httpx.AsyncClient(follow_redirects=True) as client:
+            r = await client.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=30)
+        r.raise_for_status()
+    except httpx.HTTPError as e:
+        print(f"     - Static fetch failed ({e}). Falling back to Playwright.")
+        return []
+    tree = HTMLParser(r.text)
+    raw_data = []
+    for node in tree.css(container_css)[:25]:
+        link_node = node.css_first(link_css) if link_css else node
+        if link_node is None:
+            continue
+        link_suffix = link_node.attributes.get(link_attr)
+        if not link_suffix:
+            continue
+        raw_data.append({"raw_text": node.text(separator=' ', strip=True), "url": base_url + link_suffix})
+    return raw_data
+
+async def scrape_internshala(get_page, query: str) -> List[Dict]:
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
     print(f"   > Scraping Internshala for '{query}'...")
     url = f"https://internshala.com/internships/keywords-{query.replace(' ', '%20')}"
-    page.goto(url, wait_until="domcontentloaded", timeout=90000)
-    if page.is_visible("#no_thanks", timeout=2000): 
-        page.locator("#no_thanks").click()
-    
+    raw_data = await _scrape_static(url, 'div.individual_internship', 'h3.job-internship-name a',
+                                    base_url="https://internshala.com")
+    if raw_data:
+        print(f"     - Extracted {len(raw_data)} raw data blocks from Internshala via static HTTP.")
+        return raw_data
+    page = await get_page()
+    await _block_heavy_resources(page)
+    await page.goto(url, wait_until="commit", timeout=60000)
+    if await page.is_visible("#no_thanks", timeout=2000):
+        await page.locator("#no_thanks").click()
+
     container_selector = 'div.individual_internship'
     try:
-        page.wait_for_selector(container_selector, timeout=15000)
+        await page.wait_for_selector(container_selector, timeout=15000)
     except PlaywrightTimeoutError:
         print("     - No job containers found on Internshala. Skipping.")
         return []
-        
-    job_containers = page.locator(container_selector).all()
-    print(f"     - Found {len(job_containers)} potential job containers. Extracting raw data...")
+
+    doc = lxml_html.fromstring(await page.content())
     raw_data = []
-    for i, container in enumerate(job_containers[:25]):
-        print(f"       - Processing container {i+1}...", end='\r')
-        try:
-            link_element = container.locator('h3.job-internship-name a').first
-            link = "https://internshala.com" + link_element.get_attribute('href')
-            raw_text = container.inner_text()
-            raw_data.append({"raw_text": raw_text, "url": link})
-        except (PlaywrightTimeoutError, AttributeError):
+    for node in _INTERNSHALA_CONTAINER_XP(doc)[:25]:
+        href = _INTERNSHALA_LINK_XP(node)
+        if not href:
             continue
-    print(f"\n     - Successfully extracted {len(raw_data)} raw data blocks from Internshala.")
+        raw_data.append({"raw_text": node.text_content(), "url": "https://internshala.com" + href[0]})
+    print(f"     - Successfully extracted {len(raw_data)} raw data blocks from Internshala.")
     return raw_data
 
-def scrape_unstop(page, query: str) -> List[Dict]:
+async def scrape_unstop(get_page, query: str) -> List[Dict]:
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
     print(f"   > Scraping Unstop for '{query}'...")
     url = f"https://unstop.com/internships?searchTerm={query.replace(' ', '%20')}"
-    page.goto(url, wait_until="domcontentloaded", timeout=90000)
-    time.sleep(3)
+    page = await get_page()
+    await _block_heavy_resources(page)
+    await page.goto(url, wait_until="commit", timeout=60000)
+    await asyncio.sleep(3)
 
     container_selector = 'app-competition-listing > div'
     try:
-        page.wait_for_selector(container_selector, timeout=15000)
+        await page.wait_for_selector(container_selector, timeout=15000)
     except PlaywrightTimeoutError:
         print("     - No job listings found on Unstop. Skipping.")
         return []
 
-    job_cards = page.locator(container_selector).all()
-    print(f"     - Found {len(job_cards)} potential job cards. Extracting raw data...")
+    doc = lxml_html.fromstring(await page.content())
     raw_data = []
-    for i, card in enumerate(job_cards[:25]):
-        print(f"       - Processing card {i+1}...", end='\r')
-        try:
-            container_id = card.get_attribute('id')
-            if not container_id or len(container_id.split('_')) < 2:
-                continue
-            job_id = container_id.split('_')[1]
-            link = f"https://unstop.com/o/i/{job_id}"
-            raw_text = card.inner_text()
-            raw_data.append({"raw_text": raw_text, "url": link})
-        except (PlaywrightTimeoutError, AttributeError):
+    for node in _UNSTOP_CONTAINER_XP(doc)[:25]:
+        container_id = node.get('id')
+        if not container_id or len(container_id.split('_')) < 2:
             continue
-    print(f"\n     - Successfully extracted {len(raw_data)} raw data blocks from Unstop.")
+        job_id = container_id.split('_')[1]
+        raw_data.append({"raw_text": node.text_content(), "url": f"https://unstop.com/o/i/{job_id}"})
+    print(f"     - Successfully extracted {len(raw_data)} raw data blocks from Unstop.")
     return raw_data
 
-def scrape_remoteok(page, query: str) -> List[Dict]:
+async def scrape_remoteok(get_page, query: str) -> List[Dict]:
+    from playwright.async_api import TimeoutError as PlaywrightTimeoutError
     print(f"   > Scraping RemoteOK for '{query}'...")
     url = f"https://remoteok.com/remote-{query}-jobs"
-    page.goto(url, wait_until="domcontentloaded", timeout=90000)
+    raw_data = await _scrape_static(url, 'tr.job:not(.placeholder)',
+                                    base_url="https://remoteok.com", link_attr="data-url")
+    if raw_data:
+        print(f"     - Extracted {len(raw_data)} raw data blocks from RemoteOK via static HTTP.")
+        return raw_data
+    page = await get_page()
+    await _block_heavy_resources(page)
+    await page.goto(url, wait_until="commit", timeout=60000)
 
     container_selector = 'tr.job:not(.placeholder)'
     try:
-        page.wait_for_selector(container_selector, timeout=20000)
+        await page.wait_for_selector(container_selector, timeout=20000)
     except PlaywrightTimeoutError:
         print("     - No job rows found on RemoteOK after waiting. Skipping.")
         return []
 
-    job_rows = page.locator(container_selector).all()
-    print(f"     - Found {len(job_rows)} potential job rows. Extracting raw data...")
+    doc = lxml_html.fromstring(await page.content())
     raw_data = []
-    for i, row in enumerate(job_rows[:25]):
-        print(f"       - Processing row {i+1}...", end='\r')
-        try:
-            link_suffix = row.get_attribute('data-url')
-            if link_suffix:
-                link = "https://remoteok.com" + link_suffix
-                raw_text = row.inner_text()
-                raw_data.append({"raw_text": raw_text, "url": link})
-        except (PlaywrightTimeoutError, AttributeError):
+    for node in _REMOTEOK_CONTAINER_XP(doc)[:25]:
+        link_suffix = node.get('data-url')
+        if not link_suffix:
             continue
-    print(f"\n     - Successfully extracted {len(raw_data)} raw data blocks from RemoteOK.")
+        raw_data.append({"raw_text": node.text_content(), "url": "https://remoteok.com" + link_suffix})
+    print(f"     - Successfully extracted {len(raw_data)} raw data blocks from RemoteOK.")
     return raw_data
 
-# --- 4. AGENT NODES ---
+# Checkpointed state must stay serializable, so websites_to_scan carries
+# only names and queries; the node resolves the scraper through this map.
+SCRAPERS = {
+    "Internshala": scrape_internshala,
+    "Unstop": scrape_unstop,
+    "RemoteOK": scrape_remoteok,
+}
+
+# --- 5. AGENT NODES ---
 def plan_scraping_run(state: AgentState) -> dict:
     print("--- 📝 Planning Run ---")
-    with open('user_preferences.json', 'r') as f: 
+    with open('user_preferences.json', 'r') as f:
         user_preferences = json.load(f)
-    try:
-        with open('sent_jobs.json', 'r') as f: 
-            sent_job_ids = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        print("   > sent_jobs.json not found or is empty. Starting fresh.")
-        sent_job_ids = []
-    
     keywords = user_preferences.get("keywords", ["developer"])
     long_query = " ".join(keywords[:3]) 
     simple_query = keywords[0]
 
     websites_to_scan = [
-        {"name": "Internshala", "function": scrape_internshala, "query": long_query},
-        {"name": "Unstop", "function": scrape_unstop, "query": long_query},
-        {"name": "RemoteOK", "function": scrape_remoteok, "query": simple_query},
+        {"name": "Internshala", "query": long_query},
+        {"name": "Unstop", "query": long_query},
+        {"name": "RemoteOK", "query": simple_query},
     ]
+    # Pull the history into a set once per run; membership checks in the
+    # filter and dedup nodes are then O(1) with no per-row queries.
+    sent_job_ids = {row[0] for row in _sent_jobs_db().execute('SELECT id FROM sent')}
     return {
         "user_preferences": user_preferences, "sent_job_ids": sent_job_ids,
+        # Serialized once here so every prompt built later reuses the string.
+        "user_prefs_json": json.dumps(user_preferences, indent=2),
         "websites_to_scan": websites_to_scan, "run_log": [SystemMessage(content="Starting run with enhanced logging.")]
     }
 
-def scrape_websites_node(state: AgentState) -> dict:
+# Scrape results are reused within this window: under a frequent cron
+# schedule the same (site, query) returns near-identical listings anyway.
+SCRAPE_CACHE_DIR = 'cache'
+SCRAPE_CACHE_TTL_SECONDS = 900
+
+def _scrape_cache_path(site_name: str, query: str) -> str:
+    window = int(time.time() // SCRAPE_CACHE_TTL_SECONDS)
+    key = hashlib.sha1(f"{site_name}|{query}|{window}".encode()).hexdigest()
+    return os.path.join(SCRAPE_CACHE_DIR, f"{key}.json")
+
+def _prune_scrape_cache():
+    """Drop cache files from expired windows so the directory stays small."""
+    cutoff = time.time() - 2 * SCRAPE_CACHE_TTL_SECONDS
+    for name in os.listdir(SCRAPE_CACHE_DIR):
+        path = os.path.join(SCRAPE_CACHE_DIR, name)
+        if os.path.getmtime(path) < cutoff:
+            os.remove(path)
+
+async def scrape_websites_node(state: AgentState) -> dict:
     print("--- 🌐 Scraping Raw Text from Websites ---")
     all_raw_data = []
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(user_agent='Mozilla/5.0')
-        page = context.new_page()
-        for site in state['websites_to_scan']:
-            try:
-                raw_data = site["function"](page, site["query"])
-                all_raw_data.extend(raw_data)
-            except Exception as e:
-                print(f"   > FAILED to scrape {site['name']}. Error: {e}")
-            time.sleep(1)
-        browser.close()
+    sites = state['websites_to_scan']
+    os.makedirs(SCRAPE_CACHE_DIR, exist_ok=True)
+    _prune_scrape_cache()
+
+    async def scrape_site(site) -> List[Dict]:
+        cache_path = _scrape_cache_path(site['name'], site['query'])
+        if os.path.exists(cache_path):
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            print(f"   > Reusing {len(cached)} cached raw blocks for {site['name']} (within {SCRAPE_CACHE_TTL_SECONDS}s window).")
+            return cached
+        # The context is checked out lazily: scrapers whose static HTTP path
+        # succeeds never touch the pool, so those runs skip Chromium boot
+        # entirely. Each Playwright fallback still gets its own isolated
+        # context from the persistent pool.
+        context = None
+
+        async def get_page():
+            nonlocal context
+            context = await browser_pool.checkout()
+            return await context.new_page()
+
+        try:
+            raw_data = await SCRAPERS[site["name"]](get_page, site["query"])
+        finally:
+            if context is not None:
+                await browser_pool.checkin(context)
+        # An empty result usually means a timeout or bot wall, not an empty
+        # job board — don't cache it, so the next run retries immediately.
+        if raw_data:
+            _write_json_atomic(cache_path, raw_data)
+        return raw_data
+
+    results = await asyncio.gather(*[scrape_site(site) for site in sites], return_exceptions=True)
+    for site, result in zip(sites, results):
+        if isinstance(result, BaseException):
+            print(f"   > FAILED to scrape {site['name']}. Error: {result}")
+        else:
+            all_raw_data.extend(result)
+
+    # Overlapping containers can yield the same URL twice, and innerText
+    # often drags in boilerplate; dedupe and bound each block here so every
+    # downstream stage (disk, prompt, LLM) moves fewer bytes.
+    seen_urls = set()
+    deduped = []
+    for d in all_raw_data:
+        if d['url'] in seen_urls:
+            continue
+        seen_urls.add(d['url'])
+        d['raw_text'] = ' '.join(d['raw_text'].split())[:400]
+        deduped.append(d)
+    if len(deduped) < len(all_raw_data):
+        print(f"   > Dropped {len(all_raw_data) - len(deduped)} duplicate-URL blocks.")
+    all_raw_data = deduped
 
     print(f"\n   > Found a total of {len(all_raw_data)} raw data blocks across all sites.")
     print("--- 💾 Saving all scraped raw data for review ---")
-    with open('scraped_jobs_raw.json', 'w', encoding='utf-8') as f:
-        json.dump(all_raw_data, f, indent=2, ensure_ascii=False)
+    _write_json_atomic('scraped_jobs_raw.json', all_raw_data, indent=True)
     print(f"   > Successfully saved {len(all_raw_data)} raw items to scraped_jobs_raw.json")
     return {"raw_scraped_data": all_raw_data, "run_log": [SystemMessage(content=f"Scraped {len(all_raw_data)} raw data blocks.")]}
 
-def structure_and_filter_node(state: AgentState) -> dict:
+@functools.cache
+def _gemini_model():
+    """Build the Gemini client once per process. The SDK is called directly
+    (no LangChain wrapper) so each request skips callback managers, message
+    translation and per-invoke pydantic schema reflection; JSON mode plus
+    response_schema gives the same structured output."""
+    import google.generativeai as genai
+    genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
+    return genai.GenerativeModel('gemini-1.5-flash')
+
+_GEMINI_GENERATION_CONFIG = {
+    'response_mime_type': 'application/json',
+    'response_schema': JobFilterBatch,
+    'temperature': 0,
+}
+
+# Static prompt text lives at module level; only the per-chunk candidate
+# JSON and the pre-serialized preferences get interpolated per call.
+_PROMPT_HEAD = """You are a highly efficient career advisor and data processor.
+From the raw text blocks, extract Job Title, Company, and URLs.
+Filter only jobs that match these user preferences: """
+
+def _make_filter_prompt(candidates: List[Dict], user_prefs_json: str) -> str:
+    return f"""{_PROMPT_HEAD}{user_prefs_json}
+
+Raw text blocks:
+{json.dumps(candidates, ensure_ascii=False)}"""
+
+async def structure_and_filter_node(state: AgentState) -> dict:
     print("--- 🤖🧠 Structuring and Filtering Data with Gemini (Single Call) ---")
     if not state['raw_scraped_data']:
         return {"relevant_opportunities": []}
 
     user_prefs = state['user_preferences']
-    llm = ChatGoogleGenerativeAI(model="gemini-1.5-flash", temperature=0)
-    structured_llm = llm.with_structured_output(JobFilterBatch)
+    model = _gemini_model()
 
-    prompt = f"""You are a highly efficient career advisor and data processor. 
-From the raw text blocks, extract Job Title, Company, and URLs. 
-Filter only jobs that match these user preferences: {json.dumps(user_prefs, indent=2)}"""
+    # Drop anything we already alerted on in a previous run before the LLM
+    # ever sees (and bills us for) it. deduplicate_node stays downstream as
+    # belt-and-suspenders for what the LLM echoes back.
+    sent_ids = state['sent_job_ids']
+    raw_scraped_data = [d for d in state['raw_scraped_data'] if d['url'] not in sent_ids]
+    if len(raw_scraped_data) < len(state['raw_scraped_data']):
+        print(f"   > Skipping {len(state['raw_scraped_data']) - len(raw_scraped_data)} already-sent jobs before the LLM call.")
+
+    # Cheap keyword pre-filter so Gemini only sees plausible candidates
+    # instead of all 75 raw blocks — cuts input tokens 3-10x.
+    keywords = user_prefs.get("keywords", [])
+    if keywords:
+        pattern = re.compile('|'.join(re.escape(k) for k in keywords), re.IGNORECASE)
+        candidates = [d for d in raw_scraped_data if pattern.search(d['raw_text'])]
+    else:
+        candidates = raw_scraped_data
+    print(f"   > Keyword pre-filter kept {len(candidates)} of {len(raw_scraped_data)} raw blocks.")
+    if not candidates:
+        return {"relevant_opportunities": [], "run_log": [SystemMessage(content="No raw blocks matched keywords.")]}
+    candidates = [{"raw_text": d["raw_text"][:500], "url": d["url"]} for d in candidates]
+
+    # Chunk the candidates and let Gemini process the chunks in parallel —
+    # for N candidates the LLM wall-time drops to roughly one short call.
+    chunks = [candidates[i:i + 10] for i in range(0, len(candidates), 10)]
+    prompts = [_make_filter_prompt(chunk, state['user_prefs_json']) for chunk in chunks]
+    semaphore = asyncio.Semaphore(5)
+
+    async def run_chunk(prompt: str) -> JobFilterBatch:
+        # One failed chunk (safety block, malformed JSON, transient API
+        # error) must not throw away the results of the others.
+        try:
+            async with semaphore:
+                response = await model.generate_content_async(prompt, generation_config=_GEMINI_GENERATION_CONFIG)
+            return JobFilterBatch.model_validate_json(response.text)
+        except Exception as e:
+            print(f"   > An error occurred during a Gemini chunk call: {e}")
+            return JobFilterBatch(matched_jobs=[])
+
+    results = await asyncio.gather(*[run_chunk(prompt) for prompt in prompts])
+    relevant_opportunities = [job.model_dump() for result in results for job in result.matched_jobs]
+    print(f"   > Gemini found and filtered {len(relevant_opportunities)} relevant opportunities across {len(chunks)} parallel calls.")
 
-    try:
-        result = structured_llm.invoke(prompt)
-        relevant_opportunities = [job.model_dump() for job in result.matched_jobs]
-        print(f"   > Gemini found and filtered {len(relevant_opportunities)} relevant opportunities in a single step.")
-    except Exception as e:
-        print(f"   > An error occurred during Gemini call: {e}")
-        relevant_opportunities = []
-    
     return {"relevant_opportunities": relevant_opportunities, "run_log": [SystemMessage(content=f"Filtered {len(relevant_opportunities)} jobs.")]}
 
 def deduplicate_node(state: AgentState) -> dict:
     print("--- 🗑️ De-duplicating Opportunities ---")
-    sent_ids = set(state['sent_job_ids'])
+    sent_ids = state['sent_job_ids']
     new_opportunities = [job for job in state['relevant_opportunities'] if job['id'] not in sent_ids]
     print(f" > Found {len(new_opportunities)} new jobs to alert.")
     return {"new_opportunities": new_opportunities, "run_log": [SystemMessage(content=f"Found {len(new_opportunities)} new jobs.")]}
 
+# Shared keep-alive session so alert POSTs reuse one TLS connection pool
+# instead of handshaking with api.telegram.org per message.
+_telegram_session = requests.Session()
+_telegram_session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=8))
+
 def send_alert_node(state: AgentState) -> dict:
     print("--- 📧 Sending Alert via Telegram ---")
     new_jobs = state['new_opportunities']
     bot_token, chat_id = os.getenv("TELEGRAM_BOT_TOKEN"), os.getenv("TELEGRAM_CHAT_ID")
     if not all([bot_token, chat_id]): return {}
     api_url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-    for job in new_jobs:
+
+    def send_one(job):
         message = (f"🚀 New Career Opportunity!\n\nTitle: {job['title']}\nCompany: {job['company']}\nReason: {job['reason_for_match']}\n\nApply Here: {job['url']}")
         payload = {'chat_id': chat_id, 'text': message, 'parse_mode': 'Markdown'}
-        try: 
-            requests.post(api_url, data=payload)
-        except Exception as e: 
+        try:
+            _telegram_session.post(api_url, data=payload, timeout=10)
+        except Exception as e:
             print(f" > An error occurred: {e}")
-    updated_sent_ids = state['sent_job_ids'] + [job['id'] for job in new_jobs]
-    with open('sent_jobs.json', 'w') as f: 
-        json.dump(updated_sent_ids, f, indent=2)
-    print(" > Updated sent_jobs.json.")
+
+    # Telegram allows ~30 msg/s, so an 8-way fanout stays well within limits.
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(send_one, new_jobs))
+    conn = _sent_jobs_db()
+    conn.executemany('INSERT OR IGNORE INTO sent(id) VALUES (?)', [(job['id'],) for job in new_jobs])
+    conn.commit()
+    print(" > Recorded sent jobs in sent_jobs.db.")
     return {"run_log": [SystemMessage(content=f"Sent alerts for {len(new_jobs)} jobs.")]}
 
 def should_send_alert(state: AgentState) -> str:
     return "send_alert" if len(state['new_opportunities']) > 0 else "end_run"
 
-# --- 5. Graph Definition ---
+# --- 6. Graph Definition ---
 workflow = StateGraph(AgentState)
 workflow.add_node("planner", plan_scraping_run)
 workflow.add_node("scraper", scrape_websites_node)
@@ -240,12 +506,30 @@ workflow.add_edge("scraper", "structure_and_filter")
 workflow.add_edge("structure_and_filter", "deduplicator")
 workflow.add_conditional_edges("deduplicator", should_send_alert, {"send_alert": "alerter", "end_run": END})
 workflow.add_edge("alerter", END)
-app = workflow.compile()
 
-# --- 6. Run Agent ---
+# --- 7. Run Agent ---
+async def main() -> dict:
+    # Checkpoint every node's output so a crashed run can resume without
+    # re-scraping or re-calling Gemini. One thread id per day: a retried
+    # run on the same day resumes from the last completed node.
+    run_config = {"configurable": {"thread_id": f"run-{date.today()}"}}
+    async with AsyncSqliteSaver.from_conn_string('agent_state.db') as checkpointer:
+        app = workflow.compile(checkpointer=checkpointer)
+        # LangGraph only resumes a thread when the input is None; passing a
+        # fresh input starts over from the entry point. Resume only when
+        # today's thread was left mid-run (it has pending nodes); a thread
+        # that finished cleanly starts a new run as usual.
+        snapshot = await app.aget_state(run_config)
+        if snapshot.next:
+            print(f"   > Found an interrupted run for today; resuming at {snapshot.next}.")
+            graph_input = None
+        else:
+            graph_input = {}
+        return await app.ainvoke(graph_input, config=run_config)
+
 if __name__ == "__main__":
     print("🚀 Starting Proactive Career Opportunity Monitor (Transparent Version)...")
-    final_state = app.invoke({})
+    final_state = asyncio.run(main())
     print("\n--- ✅ Agent Run Complete ---")
     print("Final Log:")
     for message in final_state.get('run_log', []):